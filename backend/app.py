@@ -1,36 +1,79 @@
 import os
+
+import eventlet
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# The Redis message queue client does blocking socket I/O, so with
+# REDIS_URL set the stdlib must be green before anything else imports it
+if os.getenv("REDIS_URL"):
+    eventlet.monkey_patch()
+
+import io
+import re
+import time
 import uuid
+import queue
 import asyncio
-import requests
+
 import edge_tts
-from flask import Flask, send_file
+from eventlet import GreenPool, tpool
+from eventlet.semaphore import Semaphore
+from flask import Flask, Response, send_file, jsonify
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from flask import request
 from deep_translator import GoogleTranslator
-from dotenv import load_dotenv
-
-load_dotenv()
 
-# Groq API
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-GROQ_API_URL = os.getenv(
-    "GROQ_API_URL",
-    "https://api.groq.com/openai/v1/audio/transcriptions"
-)
+from cache import TranslationCache, SpeechCache
+from segmenter import UtteranceSegmenter, pcm_to_wav
+from scheduler import JobScheduler, QueueFull
+from transcription import backend_from_env
+from rooms import lang_room, store_from_url
+from artifacts import ArtifactStore
+from metrics import Registry
 
 # Flask app
 app = Flask(__name__)
 app.config["SECRET_KEY"] = os.getenv("FLASK_SECRET_KEY", "default-secret-key")
 
+# Set REDIS_URL to share rooms and emits between several server processes
+# (needs the `redis` package; the process is monkey-patched above)
+REDIS_URL = os.getenv("REDIS_URL")
+
 # SocketIO with eventlet async mode (stable)
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode="eventlet")
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode="eventlet", message_queue=REDIS_URL)
 
 # Uploads
 UPLOAD_FOLDER = "uploads"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-# Track connected users and their language
-user_langs = {}
+# Translation + TTS caches (memory LRU in front of a disk store)
+CACHE_FOLDER = os.getenv("CACHE_FOLDER", "cache")
+translation_cache = TranslationCache(
+    os.path.join(CACHE_FOLDER, "translations"),
+    memory_items=int(os.getenv("TRANSLATION_CACHE_ITEMS", "2048")),
+    disk_quota_bytes=int(os.getenv("TRANSLATION_CACHE_MB", "16")) * 1024 * 1024,
+)
+
+# TTS clips: sharded under uploads/, TTL + quota eviction, hot in-memory buffer
+TTS_FILENAME = re.compile(r"^[0-9a-f]{32,64}_[A-Za-z-]+\.mp3$")
+TTS_MAX_AGE = 365 * 24 * 3600
+ARTIFACT_GC_INTERVAL = int(os.getenv("ARTIFACT_GC_INTERVAL", "300"))
+artifacts = ArtifactStore(
+    UPLOAD_FOLDER,
+    quota_bytes=int(os.getenv("TTS_CACHE_MB", "512")) * 1024 * 1024,
+    ttl_seconds=int(os.getenv("TTS_TTL_HOURS", "24")) * 3600,
+    memory_bytes=int(os.getenv("TTS_MEMORY_MB", "32")) * 1024 * 1024,
+)
+speech_cache = SpeechCache(artifacts, memory_items=int(os.getenv("TTS_CACHE_ITEMS", "512")))
+
+# Room membership and per-room language index
+DEFAULT_ROOM = "room1"
+rooms = store_from_url(REDIS_URL)
+
+# Chunked audio ingest: (sid, stream_id) -> segmenter state
+ingest_streams = {}
 
 # Voices for TTS
 VOICE_MAP = {
@@ -51,12 +94,229 @@ VOICE_MAP = {
     "vi": "vi-VN-HoaiMyNeural",
     "pl": "pl-PL-ZofiaNeural",
     "nl": "nl-NL-FennaNeural",
+    "sv": "sv-SE-SofieNeural",
+}
+
+# Languages a listener may join with: whatever the translator supports
+# (voice_for falls back to the default voice outside VOICE_MAP)
+TARGET_LANGS = set(GoogleTranslator().get_supported_languages(as_dict=True).values())
+
+# Whisper reports the detected language by name; map it back to our codes
+WHISPER_LANG_CODES = {
+    "english": "en",
+    "spanish": "es",
+    "french": "fr",
+    "german": "de",
+    "hindi": "hi",
+    "italian": "it",
+    "japanese": "ja",
+    "korean": "ko",
+    "portuguese": "pt",
+    "russian": "ru",
+    "arabic": "ar",
+    "bengali": "bn",
+    "tamil": "ta",
+    "turkish": "tr",
+    "vietnamese": "vi",
+    "polish": "pl",
+    "dutch": "nl",
+    "swedish": "sv",
 }
 
+# Max number of target languages translated + synthesized at the same time
+FANOUT_CONCURRENCY = int(os.getenv("FANOUT_CONCURRENCY", "4"))
+
+# Stream TTS audio over the socket as it is synthesized instead of sending a URL
+TTS_STREAMING = os.getenv("TTS_STREAMING", "1") == "1"
+# Also keep streamed clips on disk so repeats hit the TTS cache
+TTS_STREAM_CACHE = os.getenv("TTS_STREAM_CACHE", "1") == "1"
+# Each live stream holds one eventlet tpool thread (20 by default) for its
+# producer; keep well below that so transcribe/translate always get threads
+TTS_STREAM_CONCURRENCY = int(os.getenv("TTS_STREAM_CONCURRENCY", "8"))
+tts_stream_slots = Semaphore(TTS_STREAM_CONCURRENCY)
+
+# Utterance segmentation for chunked audio_chunk ingest
+SEGMENT_SILENCE_MS = int(os.getenv("SEGMENT_SILENCE_MS", "600"))
+SEGMENT_MAX_MS = int(os.getenv("SEGMENT_MAX_MS", "8000"))
+MIN_SAMPLE_RATE = 8000
+MAX_SAMPLE_RATE = 48000
+
+# Job scheduler for the network-bound transcribe → translate → TTS chain
+WORKERS = int(os.getenv("WORKERS", "4"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "64"))
+JOBS_PER_SPEAKER = int(os.getenv("JOBS_PER_SPEAKER", "8"))
+
+# Speech-to-text: Groq Whisper by default, see transcription.backend_from_env
+transcriber = backend_from_env(pool_size=WORKERS)
+
+# Metrics, exposed in Prometheus text format on /metrics
+connected_clients = 0
+registry = Registry()
+stage_seconds = registry.histogram(
+    "communique_stage_seconds", "Time spent in each pipeline stage, by language and voice")
+utterance_seconds = registry.histogram(
+    "communique_utterance_seconds", "Time from audio ingest to the last listener emit")
+failures = registry.counter(
+    "communique_failures_total", "Pipeline failures, by stage")
+empty_transcriptions = registry.counter(
+    "communique_empty_transcriptions_total", "Transcriptions that returned no text")
+registry.gauge("communique_connected_clients", "Connected Socket.IO clients", lambda: connected_clients)
+registry.gauge("communique_active_jobs", "Jobs currently running", lambda: scheduler.active)
+registry.gauge("communique_queued_jobs", "Jobs waiting in the queue", lambda: scheduler.pending)
+registry.gauge("communique_uploads_bytes", "Bytes of TTS clips under uploads/", lambda: artifacts.total_bytes)
+
 # Async TTS
-async def generate_speech_async(text, voice, file_path):
-    communicate = edge_tts.Communicate(text, voice)
-    await communicate.save(file_path)
+async def generate_speech_async(text, voice):
+    audio = bytearray()
+    async for chunk in edge_tts.Communicate(text, voice).stream():
+        if chunk["type"] == "audio":
+            audio.extend(chunk["data"])
+    return bytes(audio)
+
+def translate(text, source_lang, target_lang):
+    if source_lang and source_lang == target_lang:
+        return text
+
+    translated = translation_cache.get(text, target_lang)
+    if translated is None:
+        translated = GoogleTranslator(source="auto", target=target_lang).translate(text)
+        translation_cache.put(text, target_lang, translated)
+    return translated
+
+def voice_for(lang):
+    return VOICE_MAP.get(lang, "en-US-JennyNeural")
+
+def synthesize(text, target_lang):
+    """Synthesize `text` into the TTS cache and return its filename."""
+    voice = voice_for(target_lang)
+    filename = SpeechCache.filename(text, voice, target_lang)
+    speech_cache.store(filename, asyncio.run(generate_speech_async(text, voice)))
+    return filename
+
+def stream_speech(text, voice):
+    """
+    Yield MP3 chunks as edge-tts produces them. Synthesis runs in the eventlet
+    thread pool; the calling green thread polls for chunks so it never ties
+    up a pool thread of its own while waiting.
+    """
+    chunks = queue.Queue()
+
+    async def produce_async():
+        async for chunk in edge_tts.Communicate(text, voice).stream():
+            if chunk["type"] == "audio":
+                chunks.put(chunk["data"])
+
+    def produce():
+        try:
+            asyncio.run(produce_async())
+            chunks.put(None)
+        except Exception as e:
+            chunks.put(e)
+
+    with tts_stream_slots:
+        eventlet.spawn_n(tpool.execute, produce)
+        while True:
+            try:
+                chunk = chunks.get_nowait()
+            except queue.Empty:
+                socketio.sleep(0.01)
+                continue
+            if chunk is None:
+                return
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+def stream_to(target, message, translated, target_lang):
+    """
+    Push synthesized audio to listeners as tts_start / tts_chunk / tts_end
+    events so playback can begin before synthesis finishes.
+    """
+    voice = voice_for(target_lang)
+    stream_id = uuid.uuid4().hex
+    start = time.perf_counter()
+    socketio.emit("tts_start", {**message, "stream_id": stream_id, "mime": "audio/mpeg"}, to=target)
+
+    audio = []
+    seq = 0
+    try:
+        for chunk in stream_speech(translated, voice):
+            if seq == 0:
+                stage_seconds.observe(time.perf_counter() - start, stage="tts_first_chunk",
+                                      lang=target_lang, voice=voice)
+            socketio.emit("tts_chunk", {"stream_id": stream_id, "seq": seq, "data": chunk}, to=target)
+            if TTS_STREAM_CACHE:
+                audio.append(chunk)
+            seq += 1
+    except Exception as e:
+        failures.inc(stage="tts")
+        print(f"⚠️ TTS stream failed for lang {target_lang}: {str(e)}")
+        socketio.emit("tts_end", {"stream_id": stream_id, "chunks": seq, "error": True}, to=target)
+        return
+
+    stage_seconds.observe(time.perf_counter() - start, stage="tts", lang=target_lang, voice=voice)
+    end = {"stream_id": stream_id, "chunks": seq}
+    if audio:
+        filename = SpeechCache.filename(translated, voice, target_lang)
+        try:
+            # Hashing, the file write and quota eviction stay off the hub
+            tpool.execute(speech_cache.store, filename, b"".join(audio))
+            end["tts_url"] = f"/tts/{filename}"
+        except Exception as e:
+            # Listeners already have the audio; only replay/caching is lost
+            failures.inc(stage="tts_cache")
+            print(f"⚠️ Could not cache TTS clip for lang {target_lang}: {str(e)}")
+    socketio.emit("tts_end", end, to=target)
+
+def transcribe(audio_bytes, filename, mime):
+    """Returns (text, detected language code)."""
+    text, language = transcriber.transcribe(audio_bytes, filename, mime)
+    return text, WHISPER_LANG_CODES.get((language or "").lower())
+
+def fan_out(room, transcribed_text, source_lang, meta=None):
+    """
+    Translate + TTS once per target language present in `room` and emit the
+    result to that language's listeners as soon as it is ready.
+    """
+    def deliver(target_lang):
+        target = lang_room(room, target_lang)
+        voice = voice_for(target_lang)
+        stage = "translate"
+        try:
+            with stage_seconds.time(stage="translate", lang=target_lang):
+                translated = tpool.execute(translate, transcribed_text, source_lang, target_lang)
+            message = {
+                **(meta or {}),
+                "orig_text": transcribed_text,
+                "translated_text": translated,
+                "lang": target_lang
+            }
+
+            stage = "tts"
+            cached = speech_cache.get(translated, voice, target_lang)
+            if TTS_STREAMING and cached is None:
+                stream_to(target, message, translated, target_lang)
+                return
+
+            tts_filename = cached
+            if tts_filename is None:
+                with stage_seconds.time(stage="tts", lang=target_lang, voice=voice):
+                    tts_filename = tpool.execute(synthesize, translated, target_lang)
+        except Exception as e:
+            failures.inc(stage=stage)
+            print(f"⚠️ Error with lang {target_lang} in {room}: {str(e)}")
+            return
+
+        with stage_seconds.time(stage="emit", lang=target_lang):
+            socketio.emit("new_message", {**message, "tts_url": f"/tts/{tts_filename}"}, to=target)
+
+    pool = GreenPool(FANOUT_CONCURRENCY)
+    for target_lang in rooms.languages(room):
+        pool.spawn_n(deliver, target_lang)
+    pool.waitall()
+
+    if meta and "t_ingest" in meta:
+        utterance_seconds.observe(time.time() - meta["t_ingest"])
 
 @app.route("/")
 def index():
@@ -64,99 +324,296 @@ def index():
 
 @app.route("/tts/<filename>")
 def serve_tts(filename):
-    path = os.path.join(UPLOAD_FOLDER, filename)
-    if os.path.exists(path):
-        return send_file(path, as_attachment=False)
-    return "File not found", 404
+    """
+    Clips never change once written, so they are served with a strong ETag
+    and an immutable Cache-Control; Range requests are honoured by send_file.
+    """
+    data = artifacts.read(filename) if TTS_FILENAME.match(filename) else None
+    if data is None:
+        return "File not found", 404
+
+    response = send_file(
+        io.BytesIO(data),
+        mimetype="audio/mpeg",
+        conditional=True,
+        etag=artifacts.etag(filename),
+        max_age=TTS_MAX_AGE,
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+@app.route("/metrics")
+def metrics():
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/cache/stats")
+def cache_stats():
+    return jsonify({
+        "translation": translation_cache.stats.as_dict(),
+        "tts": {
+            **speech_cache.stats.as_dict(),
+            "disk_bytes": speech_cache.disk.total_bytes,
+        },
+    })
+
+def collect_artifacts():
+    while True:
+        socketio.sleep(ARTIFACT_GC_INTERVAL)
+        try:
+            removed = tpool.execute(artifacts.collect_garbage)
+            if removed:
+                print(f"🧹 Removed {removed} expired TTS clips")
+        except Exception as e:
+            print(f"⚠️ TTS garbage collection failed: {str(e)}")
+
+artifact_gc = None
 
 # --- Socket.IO Events ---
 
 @socketio.on("connect")
 def handle_connect():
+    global artifact_gc, connected_clients
+    connected_clients += 1
     print(f"🔌 Client connected: {request.sid}")
+    # Started from here so it runs in the server's hub (see JobScheduler.start)
+    if artifact_gc is None:
+        artifact_gc = socketio.start_background_task(collect_artifacts)
 
 @socketio.on("disconnect")
 def handle_disconnect():
+    global connected_clients
+    connected_clients -= 1
     print(f"❌ Client disconnected: {request.sid}")
-    if request.sid in user_langs:
-        del user_langs[request.sid]
+    rooms.leave(request.sid)
+    for key in [k for k in ingest_streams if k[0] == request.sid]:
+        del ingest_streams[key]
+    scheduler.drop_speaker(request.sid)
 
 @socketio.on("join")
 def handle_join(data):
-    lang = data.get("lang", "en")
-    user_langs[request.sid] = lang
-    join_room("room1")
-    print(f"✅ Client {request.sid} joined with lang {lang}")
-    emit("joined", {"msg": f"Joined with lang {lang}"}, room=request.sid)
+    lang = data.get("lang")
+    if lang not in TARGET_LANGS:
+        lang = "en"
+    room = data.get("room") or DEFAULT_ROOM
 
-@socketio.on("process_audio")
-def handle_process_audio(data):
+    previous = rooms.leave(request.sid)
+    if previous:
+        leave_room(previous[0])
+        leave_room(lang_room(*previous))
+
+    rooms.join(request.sid, room, lang)
+    join_room(room)
+    join_room(lang_room(room, lang))
+    print(f"✅ Client {request.sid} joined {room} with lang {lang}")
+    emit("joined", {"msg": f"Joined {room} with lang {lang}", "room": room}, room=request.sid)
+
+def process_utterance(room, audio_bytes, filename, mime, meta=None):
+    """Transcribe → Translate → TTS → Broadcast for one utterance."""
+    if meta and "t_ingest" in meta:
+        stage_seconds.observe(time.time() - meta["t_ingest"], stage="queue_wait")
+
+    # 1. Transcribe (Groq Whisper unless TRANSCRIBE_BACKEND says otherwise)
+    try:
+        with stage_seconds.time(stage="transcribe"):
+            transcribed_text, source_lang = tpool.execute(transcribe, audio_bytes, filename, mime)
+    except Exception:
+        failures.inc(stage="transcribe")
+        raise
+
+    if not transcribed_text:
+        empty_transcriptions.inc()
+        print("⚠️ No text returned from transcription")
+        return
+
+    print(f"📝 Transcribed [{source_lang or 'unknown'}]: {transcribed_text}")
+
+    # 2. Translate + TTS once per language, fanned out to its listeners
+    fan_out(room, transcribed_text, source_lang, meta)
+
+def process_segment(room, pcm, sample_rate, meta):
+    try:
+        process_utterance(room, pcm_to_wav(pcm, sample_rate), f"{uuid.uuid4().hex}.wav", "audio/wav", meta)
+    finally:
+        # Even when the last segment fails or transcribes to nothing
+        if meta["final"]:
+            end_stream(room, meta["source_stream_id"])
+
+# --- Job scheduling ---
+
+def job_status(job, status, **extra):
+    socketio.emit("job_status", {"job_id": job.id, "status": status, **extra}, room=job.speaker)
+
+def on_job_start(job):
+    job_status(job, "started")
+
+def on_job_done(job):
+    if "error" in job.meta:
+        job_status(job, "failed", error=job.meta["error"])
+    else:
+        job_status(job, "done")
+
+scheduler = JobScheduler(
+    socketio.start_background_task,
+    workers=WORKERS,
+    max_queue=JOB_QUEUE_SIZE,
+    max_per_speaker=JOBS_PER_SPEAKER,
+    on_start=on_job_start,
+    on_done=on_job_done,
+)
+
+def speaker_room():
+    membership = rooms.membership(request.sid)
+    return membership[0] if membership else DEFAULT_ROOM
+
+def new_trace():
+    """Per-utterance trace id plus ingest time, carried through to listeners."""
+    return {"trace_id": uuid.uuid4().hex, "t_ingest": time.time()}
+
+def submit_job(fn, *args, coalesce=None, trace_id=None, sent_at=None):
     """
-    User sends an audio blob → Transcribe → Translate → TTS → Broadcast to all users
+    Queue work for the calling client; returns the ack sent back to it.
+    When the queue is full, `coalesce` gets a chance to fold the work into
+    an already queued job before the client is told the server is busy.
+    `sent_at` (the client's own clock) is echoed to the speaker only, so it
+    can measure latency for its trace ids without mixing clocks.
     """
+    extra = {"trace_id": trace_id} if trace_id else {}
+    if isinstance(sent_at, (int, float)):
+        extra["sent_at"] = sent_at
     try:
-        audio_bytes = data.get("file")
-        if not audio_bytes:
-            return
+        job = scheduler.submit(request.sid, fn, *args)
+    except QueueFull as e:
+        ack = coalesce() if coalesce else None
+        if ack:
+            return ack
+        failures.inc(stage="queue_full")
+        ack = {"status": "busy", "reason": str(e), **extra}
+        emit("job_status", ack, room=request.sid)
+        return ack
 
-        # Save temp audio file
-        temp_file = os.path.join(UPLOAD_FOLDER, f"{uuid.uuid4().hex}.webm")
-        with open(temp_file, "wb") as f:
-            f.write(audio_bytes)
+    ack = {"job_id": job.id, "status": "queued", "position": scheduler.position(job), **extra}
+    emit("job_status", ack, room=request.sid)
+    return ack
 
-        # 1. Transcribe with Groq Whisper
-        headers = {"Authorization": f"Bearer {GROQ_API_KEY}"}
-        with open(temp_file, "rb") as f:
-            resp = requests.post(
-                GROQ_API_URL,
-                headers=headers,
-                files={
-                    "file": (os.path.basename(temp_file), f, "audio/webm"),
-                    "model": (None, "whisper-large-v3")
-                }  
+def coalesce_segment(pcm, meta):
+    """
+    Append a segment to the speaker's last queued segment of the same stream
+    instead of growing the queue. Returns the ack, or None if not possible.
+    """
+    job = scheduler.last_pending(request.sid)
+    if job is None or job.fn is not process_segment or job.args[3]["source_stream_id"] != meta["source_stream_id"]:
+        return None
 
+    room, queued_pcm, sample_rate, queued_meta = job.args
+    job.args = (room, queued_pcm + pcm, sample_rate, {**queued_meta, "final": meta["final"]})
+    ack = {"job_id": job.id, "status": "coalesced", "position": scheduler.position(job)}
+    emit("job_status", ack, room=request.sid)
+    return ack
 
-            )
+@socketio.on("process_audio")
+def handle_process_audio(data):
+    """
+    User sends an audio blob → queued job: Transcribe → Translate → TTS → Broadcast
+    """
+    audio_bytes = data.get("file")
+    if not audio_bytes:
+        return {"status": "rejected", "reason": "no audio"}
 
-        if resp.status_code != 200:
-            print("❌ Transcription failed:", resp.text)
-            return
+    trace = new_trace()
+    return submit_job(process_utterance, speaker_room(), audio_bytes, f"{uuid.uuid4().hex}.webm", "audio/webm",
+                      trace, trace_id=trace["trace_id"], sent_at=data.get("sent_at"))
 
-        transcribed_text = resp.json().get("text", "").strip()
-        if not transcribed_text:
-            print("⚠️ No text returned from transcription")
-            return
+@socketio.on("audio_chunk")
+def handle_audio_chunk(data):
+    """
+    Incremental ingest: the speaker streams mono 16-bit PCM while talking.
+    Each pause-delimited segment is queued for transcription as soon as it is
+    complete, so listeners get partial results while the speaker keeps going.
+    """
+    stream_id = data.get("stream_id")
+    if not stream_id:
+        return
 
-        print(f"📝 Transcribed: {transcribed_text}")
+    seq = data.get("seq")
+    chunk = data.get("data") or b""
+    if seq is not None and (not isinstance(seq, int) or isinstance(seq, bool)):
+        return {"status": "rejected", "reason": "seq must be an integer"}
+    if not isinstance(chunk, (bytes, bytearray)):
+        return {"status": "rejected", "reason": "data must be binary PCM"}
 
-        # 2. Translate + TTS for each listener
-        for sid, target_lang in user_langs.items():
-            try:
-                translated = GoogleTranslator(source="auto", target=target_lang).translate(transcribed_text)
+    key = (request.sid, stream_id)
+    stream = ingest_streams.get(key)
+    if stream is None:
+        try:
+            sample_rate = int(data.get("sample_rate", 16000))
+        except (TypeError, ValueError):
+            sample_rate = 0
+        if not MIN_SAMPLE_RATE <= sample_rate <= MAX_SAMPLE_RATE:
+            return {"status": "rejected", "reason": "unsupported sample_rate"}
+        stream = ingest_streams[key] = {
+            "segmenter": UtteranceSegmenter(
+                sample_rate=sample_rate,
+                silence_ms=SEGMENT_SILENCE_MS,
+                max_segment_ms=SEGMENT_MAX_MS,
+            ),
+            "sample_rate": sample_rate,
+            "next_seq": 0,
+            "segments": 0,
+        }
 
-                # Generate TTS
-                unique_id = uuid.uuid4().hex
-                tts_file = os.path.join(UPLOAD_FOLDER, f"{unique_id}_{target_lang}.mp3")
-                voice = VOICE_MAP.get(target_lang, "en-US-JennyNeural")
-                asyncio.run(generate_speech_async(translated, voice, tts_file))
+    # Drop replays and anything out of order
+    if seq is None:
+        seq = stream["next_seq"]
+    if seq < stream["next_seq"]:
+        return
+    stream["next_seq"] = seq + 1
 
-                # Emit event to each user
-                socketio.emit("new_message", {
-                    "orig_text": transcribed_text,
-                    "translated_text": translated,
-                    "tts_url": f"/tts/{os.path.basename(tts_file)}",
-                    "lang": target_lang
-                }, room=sid)
+    segmenter = stream["segmenter"]
+    segments = segmenter.feed(bytes(chunk))
 
-            except Exception as e:
-                print(f"⚠️ Error with user {sid}: {str(e)}")
+    final = bool(data.get("final"))
+    if final:
+        del ingest_streams[key]
+        tail = segmenter.flush()
+        if tail:
+            segments.append(tail)
 
-    except Exception as e:
-        print(f"🔥 Error in process_audio: {str(e)}")
+    room = speaker_room()
+    final_queued = False
+    for i, pcm in enumerate(segments):
+        meta = {
+            **new_trace(),
+            "source_stream_id": stream_id,
+            "segment": stream["segments"],
+            "final": final and i == len(segments) - 1,
+        }
+        stream["segments"] += 1
+        ack = submit_job(process_segment, room, pcm, stream["sample_rate"], meta,
+                         coalesce=lambda: coalesce_segment(pcm, meta), trace_id=meta["trace_id"],
+                         sent_at=data.get("sent_at"))
+        final_queued = meta["final"] and ack["status"] in ("queued", "coalesced")
 
-    finally:
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
+    if final and not final_queued:
+        end_of_stream(room, stream_id)
+
+def end_stream(room, stream_id):
+    socketio.emit("stream_end", {"source_stream_id": stream_id}, to=room)
+
+def end_of_stream(room, stream_id):
+    """
+    The final chunk closed no segment of its own (the speaker was already
+    silent), so let listeners know the stream is over some other way: flag
+    the speaker's last queued segment as final, or queue an end marker
+    behind its in-flight segments.
+    """
+    job = scheduler.last_pending(request.sid)
+    if job is not None and job.fn is process_segment and job.args[3]["source_stream_id"] == stream_id:
+        job.args = (*job.args[:3], {**job.args[3], "final": True})
+        return
+
+    if submit_job(end_stream, room, stream_id)["status"] != "queued":
+        end_stream(room, stream_id)
 
 
 if __name__ == "__main__":
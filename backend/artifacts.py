@@ -0,0 +1,146 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from cache import DiskStore
+
+
+class ArtifactStore(DiskStore):
+    """
+    Managed store for synthesized clips.
+
+    Files are sharded as <root>/ab/cd/<name> so no single directory grows
+    large. On top of the byte quota, clips not accessed for `ttl_seconds`
+    are removed by `collect_garbage`. Recently written clips are also kept
+    in a small in-memory buffer so a broadcast to many listeners doesn't
+    reread the same file for each request.
+
+    Several workers may share the directory. A clip missing from this
+    worker's index is looked up on disk and adopted, so quota and TTL are
+    enforced per worker over the clips it has written or served.
+    """
+
+    def __init__(self, directory, quota_bytes, ttl_seconds, memory_bytes=0,
+                 suffix=".mp3", on_evict=None):
+        self.ttl_seconds = ttl_seconds
+        self.memory_bytes = memory_bytes
+        self._hot = OrderedDict()  # name -> bytes
+        self._hot_total = 0
+        self._etags = {}
+        self._accessed = {}  # name -> last access (wall clock)
+        self._hot_lock = threading.Lock()
+        super().__init__(directory, quota_bytes, suffix=suffix, on_evict=on_evict)
+
+    def path(self, name):
+        return os.path.join(self.directory, name[:2], name[2:4], name)
+
+    def _load(self):
+        entries = []
+        for dirpath, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if not filename.endswith(self.suffix):
+                    continue
+                path = os.path.join(dirpath, filename)
+                # Files from the old flat layout move into their shard
+                if path != self.path(filename):
+                    os.makedirs(os.path.dirname(self.path(filename)), exist_ok=True)
+                    os.replace(path, self.path(filename))
+                    path = self.path(filename)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, filename, stat.st_size))
+        for mtime, name, size in sorted(entries):
+            self._index[name] = size
+            self._accessed[name] = mtime
+            self._total += size
+
+    def contains(self, name):
+        if not super().contains(name):
+            # Another worker sharing the directory may have written it
+            if not os.path.isfile(self.path(name)):
+                return False
+            try:
+                self.add(name)
+            except OSError:
+                return False
+        self._accessed[name] = time.time()
+        return True
+
+    def write(self, name, data):
+        os.makedirs(os.path.dirname(self.path(name)), exist_ok=True)
+        super().write(name, data)
+        self._remember(name, data)
+
+    def add(self, name):
+        self._accessed[name] = time.time()
+        super().add(name)
+
+    def discard(self, name):
+        super().discard(name)
+        self._forget(name)
+
+    def read(self, name):
+        with self._hot_lock:
+            data = self._hot.get(name)
+            if data is not None:
+                self._hot.move_to_end(name)
+        if data is not None:
+            self._accessed[name] = time.time()
+            return data
+        data = super().read(name)
+        if data is not None:
+            self._accessed[name] = time.time()
+            self._remember(name, data)
+        return data
+
+    def etag(self, name):
+        """Strong ETag: hash of the clip's bytes, computed once per clip."""
+        etag = self._etags.get(name)
+        if etag is None:
+            data = self.read(name)
+            if data is None:
+                return None
+            etag = self._etags[name] = hashlib.sha256(data).hexdigest()[:32]
+        return etag
+
+    def _remember(self, name, data):
+        self._etags[name] = hashlib.sha256(data).hexdigest()[:32]
+        if len(data) > self.memory_bytes:
+            return
+        with self._hot_lock:
+            self._hot_total += len(data) - len(self._hot.pop(name, b""))
+            self._hot[name] = data
+            while self._hot_total > self.memory_bytes:
+                _, old = self._hot.popitem(last=False)
+                self._hot_total -= len(old)
+
+    def _forget(self, name):
+        self._etags.pop(name, None)
+        self._accessed.pop(name, None)
+        with self._hot_lock:
+            self._hot_total -= len(self._hot.pop(name, b""))
+
+    def _evict(self):
+        evicted = super()._evict()
+        for name in evicted:
+            self._forget(name)
+        return evicted
+
+    def collect_garbage(self):
+        """Delete clips idle for longer than the TTL. Returns how many went."""
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            expired = [name for name in self._index if self._accessed.get(name, 0) < cutoff]
+            for name in expired:
+                self._total -= self._index.pop(name)
+                self._forget(name)
+
+        for name in expired:
+            try:
+                os.remove(self.path(name))
+            except OSError:
+                pass
+            if self.on_evict:
+                self.on_evict(name)
+        return len(expired)
@@ -0,0 +1,267 @@
+"""
+End-to-end load test: simulated speakers and listeners against the app
+running with local stand-ins (see server.py).
+
+    python backend/bench/run.py --speakers 4 --listeners 40 --utterances 10 \\
+        --out bench_output.json -- --tts-latency-ms 600 --unique-text
+
+Speakers send the recorded .webm fixtures through process_audio; every
+client (speakers included) joins one room with a language from --langs.
+Reports throughput, delivery ratio, client-side end-to-end latency
+percentiles and the server's per-stage percentiles from /metrics as JSON.
+Arguments after `--` go to server.py. Exits non-zero when a --max-* /
+--min-* threshold is missed, so it can gate CI.
+
+Needs the python-socketio client (`pip install "python-socketio[client]"`).
+"""
+import os
+import re
+import sys
+import glob
+import json
+import time
+import argparse
+import threading
+import subprocess
+import urllib.request
+
+import socketio
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+METRIC_LINE = re.compile(r'^(communique_\w+?)(?:\{(.*)\})? ([0-9.eE+-]+)$')
+
+
+def parse_args():
+    argv = sys.argv[1:]
+    server_args = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, server_args = argv[:split], argv[split + 1:]
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="use an already running server instead of starting server.py")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--speakers", type=int, default=2)
+    parser.add_argument("--listeners", type=int, default=10)
+    parser.add_argument("--langs", default="en,es,fr,de,hi")
+    parser.add_argument("--room", default="bench")
+    parser.add_argument("--utterances", type=int, default=5, help="per speaker")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between a speaker's utterances")
+    parser.add_argument("--fixture", action="append", help="audio file(s) to send (default: fixtures/*.webm)")
+    parser.add_argument("--drain-timeout", type=float, default=30.0)
+    parser.add_argument("--out", help="write the JSON results here as well as to stdout")
+    parser.add_argument("--max-p95-ms", type=float)
+    parser.add_argument("--max-p99-ms", type=float)
+    parser.add_argument("--min-delivery-ratio", type=float)
+    args = parser.parse_args(argv)
+    args.server_args = server_args
+    return args
+
+
+def percentiles(values):
+    if not values:
+        return {"count": 0}
+    values = sorted(values)
+
+    def pick(q):
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    return {
+        "count": len(values),
+        "mean_ms": round(1000 * sum(values) / len(values), 2),
+        "p50_ms": round(1000 * pick(0.5), 2),
+        "p95_ms": round(1000 * pick(0.95), 2),
+        "p99_ms": round(1000 * pick(0.99), 2),
+        "max_ms": round(1000 * values[-1], 2),
+    }
+
+
+def start_server(args):
+    cmd = [sys.executable, os.path.join(BENCH_DIR, "server.py"), "--port", str(args.port), *args.server_args]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    for line in proc.stdout:
+        if line.startswith("READY"):
+            break
+    else:
+        raise RuntimeError("bench server exited before it was ready")
+    # Keep draining its stdout so the server never blocks on a full pipe
+    threading.Thread(target=lambda: [None for _ in proc.stdout], daemon=True).start()
+    time.sleep(0.5)
+    return proc
+
+
+class Recorder:
+    """Client-side timestamps, keyed by trace id."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sent = {}        # trace_id -> send time
+        self.delivered = {}   # (trace_id, client) -> first audio time
+        self.streams = {}     # stream_id -> trace_id
+        self.acks = {}        # status -> count
+        self.tts_errors = 0
+
+    def ack(self, status):
+        with self.lock:
+            self.acks[status] = self.acks.get(status, 0) + 1
+
+    def audio(self, trace_id, client):
+        with self.lock:
+            self.delivered.setdefault((trace_id, client), time.time())
+
+
+def make_client(url, recorder, index, room, lang):
+    client = socketio.Client(reconnection=False)
+
+    @client.on("new_message")
+    def on_message(data):
+        if data.get("trace_id"):
+            recorder.audio(data["trace_id"], index)
+
+    @client.on("tts_start")
+    def on_tts_start(data):
+        with recorder.lock:
+            recorder.streams[data["stream_id"]] = data.get("trace_id")
+
+    @client.on("tts_chunk")
+    def on_tts_chunk(data):
+        trace_id = recorder.streams.get(data["stream_id"])
+        if trace_id and data["seq"] == 0:
+            recorder.audio(trace_id, index)
+
+    @client.on("tts_end")
+    def on_tts_end(data):
+        if data.get("error"):
+            with recorder.lock:
+                recorder.tts_errors += 1
+
+    client.connect(url, transports=["websocket"])
+    client.emit("join", {"room": room, "lang": lang})
+    return client
+
+
+def speak(client, recorder, fixtures, utterances, interval, offset):
+    for i in range(utterances):
+        audio = fixtures[(offset + i) % len(fixtures)]
+        sent_at = time.time()
+        try:
+            ack = client.call("process_audio", {"file": audio}, timeout=30)
+        except socketio.exceptions.TimeoutError:
+            recorder.ack("timeout")
+            continue
+        recorder.ack(ack.get("status", "unknown"))
+        if ack.get("status") == "queued" and ack.get("trace_id"):
+            with recorder.lock:
+                recorder.sent[ack["trace_id"]] = sent_at
+        time.sleep(interval)
+
+
+def scrape_metrics(url):
+    with urllib.request.urlopen(f"{url}/metrics", timeout=10) as resp:
+        text = resp.read().decode("utf-8")
+
+    metrics = {}
+    for line in text.splitlines():
+        match = METRIC_LINE.match(line)
+        if match:
+            name, labels, value = match.groups()
+            metrics[f"{name}{{{labels}}}" if labels else name] = float(value)
+    return metrics
+
+
+def main():
+    args = parse_args()
+    fixture_paths = args.fixture or sorted(glob.glob(os.path.join(BENCH_DIR, "fixtures", "*.webm")))
+    fixtures = []
+    for path in fixture_paths:
+        with open(path, "rb") as f:
+            fixtures.append(f.read())
+
+    server = None if args.url else start_server(args)
+    url = args.url or f"http://127.0.0.1:{args.port}"
+    langs = args.langs.split(",")
+    recorder = Recorder()
+    clients = []
+
+    try:
+        total = args.speakers + args.listeners
+        for i in range(total):
+            clients.append(make_client(url, recorder, i, args.room, langs[i % len(langs)]))
+        time.sleep(0.5)
+
+        started = time.time()
+        threads = [
+            threading.Thread(target=speak, args=(clients[i], recorder, fixtures, args.utterances, args.interval, i))
+            for i in range(args.speakers)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # Wait for every queued utterance to reach every client
+        deadline = time.time() + args.drain_timeout
+        while time.time() < deadline:
+            with recorder.lock:
+                if len(recorder.delivered) >= len(recorder.sent) * total:
+                    break
+            time.sleep(0.1)
+        elapsed = time.time() - started
+
+        server_metrics = scrape_metrics(url)
+    finally:
+        for client in clients:
+            client.disconnect()
+        if server:
+            server.terminate()
+            server.wait()
+
+    with recorder.lock:
+        latencies = [at - recorder.sent[trace] for (trace, _), at in recorder.delivered.items()
+                     if trace in recorder.sent]
+        completed = {trace for trace, _ in recorder.delivered if trace in recorder.sent}
+        expected = len(recorder.sent) * total
+
+    results = {
+        "config": {
+            "speakers": args.speakers,
+            "listeners": args.listeners,
+            "langs": langs,
+            "utterances_per_speaker": args.utterances,
+            "interval_s": args.interval,
+            "fixtures": [os.path.basename(p) for p in fixture_paths],
+            "server_args": args.server_args,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "acks": recorder.acks,
+        "utterances_queued": len(recorder.sent),
+        "utterances_completed": len(completed),
+        "throughput_utterances_per_s": round(len(completed) / elapsed, 3),
+        "deliveries_per_s": round(len(latencies) / elapsed, 3),
+        "delivery_ratio": round(len(latencies) / expected, 4) if expected else 0.0,
+        "tts_stream_errors": recorder.tts_errors,
+        "end_to_end": percentiles(latencies),
+        "server_metrics": server_metrics,
+    }
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    print(output)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+
+    failed = []
+    e2e = results["end_to_end"]
+    if args.max_p95_ms is not None and e2e.get("p95_ms", float("inf")) > args.max_p95_ms:
+        failed.append(f"p95 {e2e.get('p95_ms')}ms > {args.max_p95_ms}ms")
+    if args.max_p99_ms is not None and e2e.get("p99_ms", float("inf")) > args.max_p99_ms:
+        failed.append(f"p99 {e2e.get('p99_ms')}ms > {args.max_p99_ms}ms")
+    if args.min_delivery_ratio is not None and results["delivery_ratio"] < args.min_delivery_ratio:
+        failed.append(f"delivery ratio {results['delivery_ratio']} < {args.min_delivery_ratio}")
+    if failed:
+        print("❌ Benchmark thresholds missed: " + "; ".join(failed), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
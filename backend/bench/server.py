@@ -0,0 +1,62 @@
+"""
+Run the app against local stand-ins instead of Groq, Google Translate and
+edge-tts, for benchmarking:
+
+    python backend/bench/server.py --port 5055 --transcribe-latency-ms 300
+
+The working directory is switched to a fresh temp dir so uploads/ and
+cache/ start empty. Prints READY once the stand-ins are up.
+"""
+import os
+import sys
+import argparse
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from stand_ins import Fault, WhisperStandIn, translator_stand_in, tts_stand_in  # noqa: E402
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--unique-text", action="store_true",
+                        help="make every transcription distinct so the caches never hit")
+    for stage, latency in (("transcribe", 300), ("translate", 80), ("tts", 400)):
+        parser.add_argument(f"--{stage}-latency-ms", type=float, default=latency)
+        parser.add_argument(f"--{stage}-jitter-ms", type=float, default=latency / 4)
+        parser.add_argument(f"--{stage}-failure-rate", type=float, default=0.0)
+    return parser.parse_args(argv)
+
+
+def fault(args, stage, offset):
+    return Fault(
+        latency_ms=getattr(args, f"{stage}_latency_ms"),
+        jitter_ms=getattr(args, f"{stage}_jitter_ms"),
+        failure_rate=getattr(args, f"{stage}_failure_rate"),
+        seed=args.seed + offset,
+    )
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    whisper = WhisperStandIn(fault(args, "transcribe", 0), unique_text=args.unique_text).start()
+    os.environ["TRANSCRIBE_BACKEND"] = "local"
+    os.environ["LOCAL_WHISPER_URL"] = whisper.url
+    os.chdir(tempfile.mkdtemp(prefix="communique-bench-"))
+
+    import app
+
+    app.GoogleTranslator = translator_stand_in(fault(args, "translate", 1))
+    app.edge_tts = tts_stand_in(fault(args, "tts", 2))
+
+    print(f"READY http://{args.host}:{args.port} (workdir {os.getcwd()})", flush=True)
+    app.socketio.run(app.app, host=args.host, port=args.port, log_output=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Deterministic local stand-ins for the external services the pipeline calls:
+a Whisper-compatible transcription endpoint (in place of Groq), a
+GoogleTranslator replacement and an edge_tts.Communicate replacement.
+Each has configurable latency and failure rate and a fixed random seed.
+"""
+import json
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from types import SimpleNamespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PHRASES = [
+    "Hello, can you hear me?",
+    "Yes, I can hear you.",
+    "Let's get started.",
+    "Could you repeat that, please?",
+    "Thank you, that's all from me.",
+]
+
+
+class Fault:
+    """Latency (mean, with ± jitter) and failure rate shared by the stand-ins."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, failure_rate=0.0, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self):
+        """Return (delay seconds, should fail)."""
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms)
+            fail = self._random.random() < self.failure_rate
+        return max(0.0, self.latency_ms + jitter) / 1000, fail
+
+
+class WhisperStandIn:
+    """
+    Minimal OpenAI-compatible /audio/transcriptions server on a background
+    thread. Requests cycle through a fixed set of phrases; with `unique_text`
+    a counter is appended so translations and TTS never hit the caches.
+    """
+
+    def __init__(self, fault, unique_text=False, language="english"):
+        self.fault = fault
+        self.unique_text = unique_text
+        self.language = language
+        self._counter = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/v1/audio/transcriptions"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def _text_for(self):
+        with self._lock:
+            self._counter += 1
+            counter = self._counter
+        text = PHRASES[counter % len(PHRASES)]
+        return f"{text} ({counter})" if self.unique_text else text
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                delay, fail = stand_in.fault.draw()
+                time.sleep(delay)
+                if fail:
+                    self._reply(503, {"error": "stand-in failure"})
+                    return
+                self._reply(200, {"text": stand_in._text_for(), "language": stand_in.language})
+
+            def _reply(self, status, payload):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def translator_stand_in(fault):
+    """Class with the GoogleTranslator(source=..., target=...).translate() shape."""
+
+    class StandInTranslator:
+        def __init__(self, source="auto", target="en"):
+            self.target = target
+
+        def translate(self, text):
+            delay, fail = fault.draw()
+            time.sleep(delay)
+            if fail:
+                raise RuntimeError("stand-in translation failure")
+            return f"[{self.target}] {text}"
+
+    return StandInTranslator
+
+
+def tts_stand_in(fault, chunks=8, chunk_bytes=2048):
+    """Object with an edge_tts-like Communicate(text, voice).stream()."""
+
+    class Communicate:
+        def __init__(self, text, voice):
+            self.seed = hashlib.sha256(f"{voice}\x1f{text}".encode("utf-8")).digest()
+
+        async def stream(self):
+            delay, fail = fault.draw()
+            for i in range(chunks):
+                await asyncio.sleep(delay / chunks)
+                if fail and i == chunks // 2:
+                    raise RuntimeError("stand-in TTS failure")
+                yield {"type": "audio", "data": (self.seed * (chunk_bytes // len(self.seed) + 1))[:chunk_bytes]}
+
+    return SimpleNamespace(Communicate=Communicate)
@@ -0,0 +1,230 @@
+import os
+import json
+import uuid
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def normalize_text(text):
+    """
+    Collapse whitespace so trivially different utterances share a key. Case
+    is kept: it can change both meaning ("US"/"us") and pronunciation.
+    """
+    return " ".join(text.split())
+
+
+def make_key(*parts):
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """Small thread-safe in-memory LRU."""
+
+    def __init__(self, max_items):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def __len__(self):
+        return len(self._items)
+
+
+class DiskStore:
+    """
+    Files in one directory with a byte quota. Least recently used files are
+    deleted once the quota is exceeded.
+    """
+
+    def __init__(self, directory, quota_bytes, suffix="", on_evict=None):
+        self.directory = directory
+        self.quota_bytes = quota_bytes
+        self.suffix = suffix
+        self.on_evict = on_evict
+        self._index = OrderedDict()  # filename -> size, oldest first
+        self._total = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(self.suffix):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._index[name] = size
+            self._total += size
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def contains(self, name):
+        with self._lock:
+            if name not in self._index:
+                return False
+            self._index.move_to_end(name)
+        if not os.path.exists(self.path(name)):
+            self.discard(name)
+            return False
+        return True
+
+    def read(self, name):
+        if not self.contains(name):
+            return None
+        try:
+            with open(self.path(name), "rb") as f:
+                return f.read()
+        except OSError:
+            self.discard(name)
+            return None
+
+    def write(self, name, data):
+        # Unique per write so concurrent writers of the same name don't collide
+        tmp_path = f"{self.path(name)}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path(name))
+        self.add(name)
+
+    def add(self, name):
+        """Register a file that was written into the directory directly."""
+        size = os.path.getsize(self.path(name))
+        with self._lock:
+            self._total += size - self._index.pop(name, 0)
+            self._index[name] = size
+            evicted = self._evict()
+        for old in evicted:
+            try:
+                os.remove(self.path(old))
+            except OSError:
+                pass
+            if self.on_evict:
+                self.on_evict(old)
+
+    def discard(self, name):
+        with self._lock:
+            self._total -= self._index.pop(name, 0)
+
+    def _evict(self):
+        evicted = []
+        while self._total > self.quota_bytes and len(self._index) > 1:
+            name, size = self._index.popitem(last=False)
+            self._total -= size
+            evicted.append(name)
+        return evicted
+
+    @property
+    def total_bytes(self):
+        return self._total
+
+
+class CacheStats:
+    def __init__(self):
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, outcome):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def as_dict(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class TranslationCache:
+    """(normalized text, target lang) -> translated text."""
+
+    def __init__(self, directory, memory_items, disk_quota_bytes):
+        self.memory = LRUCache(memory_items)
+        self.disk = DiskStore(directory, disk_quota_bytes, suffix=".json")
+        self.stats = CacheStats()
+
+    def get(self, text, target_lang):
+        key = make_key(normalize_text(text), target_lang)
+        translated = self.memory.get(key)
+        if translated is not None:
+            self.stats.record("memory_hits")
+            return translated
+
+        data = self.disk.read(f"{key}.json")
+        if data is not None:
+            translated = json.loads(data)["translated"]
+            self.memory.put(key, translated)
+            self.stats.record("disk_hits")
+            return translated
+
+        self.stats.record("misses")
+        return None
+
+    def put(self, text, target_lang, translated):
+        key = make_key(normalize_text(text), target_lang)
+        self.memory.put(key, translated)
+        payload = {"lang": target_lang, "translated": translated}
+        self.disk.write(f"{key}.json", json.dumps(payload).encode("utf-8"))
+
+
+class SpeechCache:
+    """
+    (translated text, voice) -> synthesized MP3. Files are content-addressed,
+    so a hit can hand out an existing /tts/<filename> URL as-is. `disk` is
+    any DiskStore-like store holding the clips (see artifacts.ArtifactStore).
+    """
+
+    def __init__(self, disk, memory_items):
+        self.memory = LRUCache(memory_items)
+        self.disk = disk
+        self.disk.on_evict = self.memory.discard
+        self.stats = CacheStats()
+
+    @staticmethod
+    def filename(text, voice, lang):
+        return f"{make_key(normalize_text(text), voice)}_{lang}.mp3"
+
+    def get(self, text, voice, lang):
+        """Return the cached filename, or None on a miss."""
+        name = self.filename(text, voice, lang)
+        if self.memory.get(name):
+            self.stats.record("memory_hits")
+            return name
+
+        if self.disk.contains(name):
+            self.memory.put(name, True)
+            self.stats.record("disk_hits")
+            return name
+
+        self.stats.record("misses")
+        return None
+
+    def store(self, name, data):
+        """Write synthesized audio that was collected in memory."""
+        self.disk.write(name, data)
+        self.memory.put(name, True)
@@ -0,0 +1,129 @@
+import threading
+
+
+def lang_room(room, lang):
+    """Socket.IO room holding every listener of `room` who wants `lang`."""
+    return f"{room}/{lang}"
+
+
+class RoomStore:
+    """
+    Room membership and the per-room language index. Each client is in at
+    most one room with one target language.
+    """
+
+    def join(self, sid, room, lang):
+        raise NotImplementedError
+
+    def leave(self, sid):
+        """Remove `sid`; returns its former (room, lang) or None."""
+        raise NotImplementedError
+
+    def membership(self, sid):
+        """(room, lang) for `sid`, or None."""
+        raise NotImplementedError
+
+    def languages(self, room):
+        """Target languages with at least one listener in `room`."""
+        raise NotImplementedError
+
+
+class MemoryRoomStore(RoomStore):
+    """In-process store, for a single server worker."""
+
+    def __init__(self):
+        self._members = {}  # sid -> (room, lang)
+        self._index = {}    # room -> {lang: set of sids}
+        self._lock = threading.Lock()
+
+    def join(self, sid, room, lang):
+        with self._lock:
+            self._remove(sid)
+            self._members[sid] = (room, lang)
+            self._index.setdefault(room, {}).setdefault(lang, set()).add(sid)
+
+    def leave(self, sid):
+        with self._lock:
+            return self._remove(sid)
+
+    def _remove(self, sid):
+        membership = self._members.pop(sid, None)
+        if membership is None:
+            return None
+        room, lang = membership
+        langs = self._index[room]
+        langs[lang].discard(sid)
+        if not langs[lang]:
+            del langs[lang]
+        if not langs:
+            del self._index[room]
+        return membership
+
+    def membership(self, sid):
+        return self._members.get(sid)
+
+    def languages(self, room):
+        with self._lock:
+            return set(self._index.get(room, ()))
+
+
+class RedisRoomStore(RoomStore):
+    """
+    Shared store so several server processes (behind a load balancer, with
+    Socket.IO's Redis message queue) see the same rooms.
+
+    member:<sid>       hash  {room, lang}
+    room:<room>:langs  hash  {lang: listener count}
+    """
+
+    LEAVE_SCRIPT = """
+    local member = redis.call('HMGET', KEYS[1], 'room', 'lang')
+    if not member[1] then return nil end
+    redis.call('DEL', KEYS[1])
+    local langs = ARGV[1] .. member[1] .. ':langs'
+    if redis.call('HINCRBY', langs, member[2], -1) <= 0 then
+        redis.call('HDEL', langs, member[2])
+    end
+    return member
+    """
+
+    def __init__(self, url, prefix="communique:"):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("REDIS_URL is set but the `redis` package is not installed") from exc
+
+        self.redis = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self._leave = self.redis.register_script(self.LEAVE_SCRIPT)
+
+    def _member_key(self, sid):
+        return f"{self.prefix}member:{sid}"
+
+    def _langs_key(self, room):
+        return f"{self.prefix}room:{room}:langs"
+
+    def join(self, sid, room, lang):
+        self.leave(sid)
+        with self.redis.pipeline() as pipe:
+            pipe.hset(self._member_key(sid), mapping={"room": room, "lang": lang})
+            pipe.hincrby(self._langs_key(room), lang, 1)
+            pipe.execute()
+
+    def leave(self, sid):
+        member = self._leave(keys=[self._member_key(sid)], args=[f"{self.prefix}room:"])
+        return tuple(member) if member else None
+
+    def membership(self, sid):
+        member = self.redis.hmget(self._member_key(sid), "room", "lang")
+        return tuple(member) if member[0] else None
+
+    def languages(self, room):
+        counts = self.redis.hgetall(self._langs_key(room))
+        return {lang for lang, count in counts.items() if int(count) > 0}
+
+
+def store_from_url(redis_url=None):
+    if redis_url:
+        return RedisRoomStore(redis_url)
+    return MemoryRoomStore()
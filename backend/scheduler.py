@@ -0,0 +1,144 @@
+import uuid
+from collections import OrderedDict, deque
+
+from eventlet.semaphore import Semaphore
+
+
+class Job:
+    def __init__(self, speaker, fn, args, meta=None):
+        self.id = uuid.uuid4().hex
+        self.speaker = speaker
+        self.fn = fn
+        self.args = args
+        self.meta = meta or {}
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobScheduler:
+    """
+    Bounded job queue drained by a fixed pool of green-thread workers.
+
+    Each speaker has its own FIFO and at most one job in flight, so a
+    speaker's utterances finish in order and workers rotate between speakers
+    round-robin: one chatty client cannot starve the others. `submit` raises
+    QueueFull when either the global queue or the speaker's share is full.
+    """
+
+    def __init__(self, spawn, workers=4, max_queue=64, max_per_speaker=8,
+                 on_start=None, on_done=None):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_per_speaker = max_per_speaker
+        self.on_start = on_start
+        self.on_done = on_done
+
+        self._queues = OrderedDict()  # speaker -> deque of jobs, in rotation order
+        self._running = set()         # speakers with a job in flight
+        self._pending = 0
+        self._wakeup = Semaphore(0)
+        self._spawn = spawn
+        self._started = False
+
+    def start(self):
+        # Started lazily from the first submit so the workers live in the
+        # same hub as the server (the debug reloader serves from another thread)
+        if self._started:
+            return
+        self._started = True
+        for _ in range(self.workers):
+            self._spawn(self._worker)
+
+    @property
+    def pending(self):
+        return self._pending
+
+    @property
+    def active(self):
+        return len(self._running)
+
+    def pending_for(self, speaker):
+        return len(self._queues.get(speaker, ()))
+
+    def last_pending(self, speaker):
+        jobs = self._queues.get(speaker)
+        return jobs[-1] if jobs else None
+
+    def position(self, job):
+        """Rough number of jobs ahead of `job` across all speakers."""
+        jobs = self._queues.get(job.speaker, ())
+        try:
+            index = jobs.index(job)
+        except ValueError:
+            return 0
+        ahead = 0
+        for other in self._queues.values():
+            ahead += min(len(other), index + 1)
+        return ahead - 1
+
+    def submit(self, speaker, fn, *args, meta=None):
+        if self._pending >= self.max_queue:
+            raise QueueFull("server busy")
+        if self.pending_for(speaker) >= self.max_per_speaker:
+            raise QueueFull("too many jobs queued for this speaker")
+
+        self.start()
+        job = Job(speaker, fn, args, meta)
+        self._queues.setdefault(speaker, deque()).append(job)
+        self._pending += 1
+        self._wake()
+        return job
+
+    def drop_speaker(self, speaker):
+        """Forget queued (not running) jobs of a speaker that went away."""
+        jobs = self._queues.pop(speaker, ())
+        self._pending -= len(jobs)
+
+    def _wake(self):
+        if self._wakeup.counter < self.workers:
+            self._wakeup.release()
+
+    def _next_job(self):
+        for speaker in self._queues:
+            if speaker in self._running:
+                continue
+            jobs = self._queues.pop(speaker)
+            job = jobs.popleft()
+            if jobs:
+                # Back of the rotation so other speakers go first
+                self._queues[speaker] = jobs
+            self._pending -= 1
+            self._running.add(speaker)
+            return job
+        return None
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                self._wakeup.acquire()
+                continue
+
+            self._notify(self.on_start, job)
+            try:
+                job.fn(*job.args)
+            except Exception as e:
+                print(f"🔥 Job {job.id} failed: {str(e)}")
+                job.meta["error"] = str(e)
+            finally:
+                self._running.discard(job.speaker)
+                self._notify(self.on_done, job)
+                self._wake()
+
+    @staticmethod
+    def _notify(callback, job):
+        # A failing callback (e.g. an emit to a broken message queue) must
+        # not take the worker down with it
+        if callback is None:
+            return
+        try:
+            callback(job)
+        except Exception as e:
+            print(f"⚠️ Job {job.id} status callback failed: {str(e)}")
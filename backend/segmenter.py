@@ -0,0 +1,125 @@
+import io
+import math
+import wave
+from array import array
+
+SAMPLE_WIDTH = 2  # 16-bit PCM
+
+
+def frame_rms(frame):
+    samples = array("h", frame)
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+def pcm_to_wav(pcm, sample_rate):
+    """Wrap mono 16-bit PCM in a WAV container, in memory."""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(SAMPLE_WIDTH)
+        w.setframerate(sample_rate)
+        w.writeframes(pcm)
+    return buf.getvalue()
+
+
+class UtteranceSegmenter:
+    """
+    Energy-based voice activity detection over a stream of mono 16-bit PCM.
+
+    Audio is cut into short frames; a frame counts as speech when its RMS is
+    well above a running estimate of the noise floor. A segment is closed once
+    speech is followed by `silence_ms` of quiet, or when it reaches
+    `max_segment_ms` so long monologues are still transcribed piecewise.
+    """
+
+    def __init__(self, sample_rate=16000, frame_ms=30, silence_ms=600,
+                 min_speech_ms=250, max_segment_ms=8000, preroll_ms=200,
+                 min_threshold=300.0, noise_ratio=3.0):
+        self.sample_rate = sample_rate
+        self.frame_bytes = int(sample_rate * frame_ms / 1000) * SAMPLE_WIDTH
+        if self.frame_bytes <= 0:
+            raise ValueError(f"sample_rate {sample_rate} is too low for {frame_ms}ms frames")
+        self.frame_ms = frame_ms
+        self.silence_frames = max(1, silence_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.max_segment_frames = max(1, max_segment_ms // frame_ms)
+        self.preroll_frames = preroll_ms // frame_ms
+        self.min_threshold = min_threshold
+        self.noise_ratio = noise_ratio
+
+        self.noise_floor = min_threshold / noise_ratio
+        self._pending = bytearray()
+        self._preroll = []
+        self._segment = []
+        self._speech_frames = 0
+        self._silent_run = 0
+
+    @property
+    def in_speech(self):
+        return bool(self._segment)
+
+    def _is_speech(self, rms):
+        return rms > max(self.min_threshold, self.noise_floor * self.noise_ratio)
+
+    def feed(self, pcm):
+        """Add PCM bytes; return the list of segments completed by them."""
+        self._pending.extend(pcm)
+        segments = []
+        while len(self._pending) >= self.frame_bytes:
+            frame = bytes(self._pending[:self.frame_bytes])
+            del self._pending[:self.frame_bytes]
+            segment = self._process_frame(frame)
+            if segment:
+                segments.append(segment)
+        return segments
+
+    def flush(self):
+        """End of stream: return whatever speech is still buffered."""
+        if self._pending and self.in_speech:
+            self._segment.append(bytes(self._pending))
+        self._pending.clear()
+        return self._close()
+
+    def _process_frame(self, frame):
+        rms = frame_rms(frame)
+        speech = self._is_speech(rms)
+        if not speech:
+            # Track the noise floor only on quiet frames
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * rms
+
+        if not self.in_speech:
+            if speech:
+                self._segment = self._preroll + [frame]
+                self._preroll = []
+                self._speech_frames = 1
+                self._silent_run = 0
+            elif self.preroll_frames:
+                self._preroll.append(frame)
+                del self._preroll[:-self.preroll_frames]
+            return None
+
+        self._segment.append(frame)
+        if speech:
+            self._speech_frames += 1
+            self._silent_run = 0
+        else:
+            self._silent_run += 1
+
+        if self._silent_run >= self.silence_frames:
+            # Keep a short tail of the trailing silence, drop the rest
+            del self._segment[len(self._segment) - self._silent_run + self.preroll_frames:]
+            return self._close()
+        if len(self._segment) >= self.max_segment_frames:
+            return self._close()
+        return None
+
+    def _close(self):
+        segment, speech_frames = self._segment, self._speech_frames
+        self._segment = []
+        self._speech_frames = 0
+        self._silent_run = 0
+        if speech_frames < self.min_speech_frames:
+            return None
+        return b"".join(segment)
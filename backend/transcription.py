@@ -0,0 +1,163 @@
+import os
+import time
+import random
+import hashlib
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TranscriptionError(Exception):
+    pass
+
+
+class TranscriptionBackend:
+    """Speech → text. Returns (text, language name as reported by Whisper)."""
+
+    def transcribe(self, audio_bytes, filename, mime):
+        raise NotImplementedError
+
+
+class WhisperHTTPBackend(TranscriptionBackend):
+    """
+    OpenAI-compatible /audio/transcriptions endpoint (Groq, or a local
+    Whisper server). Keeps one pooled keep-alive session, caps concurrent
+    requests, and retries 429/5xx with jittered exponential backoff. A 429
+    pauses every caller until the server's Retry-After has passed.
+    """
+
+    def __init__(self, url, api_key=None, model="whisper-large-v3", pool_size=4,
+                 max_concurrency=4, connect_timeout=5.0, read_timeout=30.0,
+                 max_retries=3, backoff=0.5, max_backoff=8.0):
+        self.url = url
+        self.model = model
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.session = requests.Session()
+        if api_key:
+            self.session.headers["Authorization"] = f"Bearer {api_key}"
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._cooldown_until = 0.0
+
+    def _wait_for_cooldown(self):
+        delay = self._cooldown_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _backoff_delay(self, attempt, resp=None):
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        # Full jitter
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _post(self, audio_bytes, filename, mime):
+        with self._slots:
+            self._wait_for_cooldown()
+            return self.session.post(
+                self.url,
+                files={
+                    "file": (filename, audio_bytes, mime),
+                    "model": (None, self.model),
+                    "response_format": (None, "verbose_json")
+                },
+                timeout=self.timeout,
+            )
+
+    def transcribe(self, audio_bytes, filename, mime):
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            try:
+                resp = self._post(audio_bytes, filename, mime)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if last_attempt:
+                    raise TranscriptionError(f"transcription request failed: {e}") from e
+                time.sleep(self._backoff_delay(attempt))
+                continue
+
+            if resp.status_code == 200:
+                result = resp.json()
+                return result.get("text", "").strip(), result.get("language")
+
+            if resp.status_code not in RETRY_STATUSES or last_attempt:
+                raise TranscriptionError(f"transcription failed ({resp.status_code}): {resp.text}")
+
+            delay = self._backoff_delay(attempt, resp)
+            if resp.status_code == 429:
+                self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+            time.sleep(delay)
+
+
+class FakeBackend(TranscriptionBackend):
+    """
+    Offline stand-in: no network, deterministic output. The phrase is picked
+    from the audio hash, so the same clip always yields the same text.
+    """
+
+    PHRASES = [
+        "Hello, can you hear me?",
+        "Yes, I can hear you.",
+        "Let's get started.",
+        "Could you repeat that, please?",
+        "Thank you, that's all from me.",
+    ]
+
+    def __init__(self, latency_ms=0, failure_rate=0.0, language="english", seed=0):
+        self.latency = latency_ms / 1000
+        self.failure_rate = failure_rate
+        self.language = language
+        self._random = random.Random(seed)
+
+    def transcribe(self, audio_bytes, filename, mime):
+        if self.latency:
+            time.sleep(self.latency)
+        if self._random.random() < self.failure_rate:
+            raise TranscriptionError("fake transcription failure")
+
+        digest = hashlib.sha256(audio_bytes).digest()
+        return self.PHRASES[digest[0] % len(self.PHRASES)], self.language
+
+
+def backend_from_env(pool_size):
+    """TRANSCRIBE_BACKEND=groq (default) | local | fake"""
+    kind = os.getenv("TRANSCRIBE_BACKEND", "groq")
+    model = os.getenv("WHISPER_MODEL", "whisper-large-v3")
+    http_options = {
+        "pool_size": pool_size,
+        "max_concurrency": int(os.getenv("TRANSCRIBE_CONCURRENCY", str(pool_size))),
+        "read_timeout": float(os.getenv("TRANSCRIBE_TIMEOUT", "30")),
+        "max_retries": int(os.getenv("TRANSCRIBE_RETRIES", "3")),
+    }
+
+    if kind == "groq":
+        return WhisperHTTPBackend(
+            os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/audio/transcriptions"),
+            api_key=os.getenv("GROQ_API_KEY"),
+            model=model,
+            **http_options,
+        )
+    if kind == "local":
+        return WhisperHTTPBackend(
+            os.getenv("LOCAL_WHISPER_URL", "http://127.0.0.1:8000/v1/audio/transcriptions"),
+            model=model,
+            **http_options,
+        )
+    if kind == "fake":
+        return FakeBackend(
+            latency_ms=float(os.getenv("FAKE_TRANSCRIBE_LATENCY_MS", "0")),
+            failure_rate=float(os.getenv("FAKE_TRANSCRIBE_FAILURE_RATE", "0")),
+        )
+    raise ValueError(f"Unknown TRANSCRIBE_BACKEND: {kind}")